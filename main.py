@@ -1,5 +1,6 @@
 import os
 import sys
+import argparse
 import glob
 import zipfile
 import json
@@ -7,11 +8,15 @@ import datetime
 import time
 import shutil
 import re
+import socket
+import sqlite3
+import threading
 from pathlib import Path
 
 import whisper
 import instructor
 import google.generativeai as genai
+from google.generativeai import caching
 from pydantic import BaseModel, Field, ValidationError
 from dotenv import load_dotenv
 from tqdm import tqdm
@@ -42,6 +47,25 @@ CONTEXT_DIR = Path(os.getenv("CONTEXT_DIR"))
 GEMINI_API_KEY = os.getenv("GEMINI_API_KEY")
 GEMINI_MODEL_NAME = os.getenv("GEMINI_MODEL_NAME")
 
+# Context caching: upload the transcript and campaign context once per session
+USE_CONTEXT_CACHE = os.getenv("USE_CONTEXT_CACHE", "true").lower() == "true"
+CONTEXT_CACHE_TTL_MINUTES = int(os.getenv("CONTEXT_CACHE_TTL_MINUTES", "60"))
+
+# Quote pre-selection: only the best-scoring transcript passages are sent to the quotes model
+QUOTE_CANDIDATE_COUNT = int(os.getenv("QUOTE_CANDIDATE_COUNT", "40"))
+QUOTE_CONTEXT_SEGMENTS = int(os.getenv("QUOTE_CONTEXT_SEGMENTS", "2"))
+
+# Full-text search index over all transcripts and notes
+SEARCH_INDEX_FILE = Path(os.getenv("SEARCH_INDEX_FILE") or OUTPUT_DIR / "_search.sqlite3")
+
+# Distributed work queue: a directory shared by all worker nodes (job database and artifacts)
+QUEUE_DIR = Path(os.getenv("QUEUE_DIR") or OUTPUT_DIR / "_queue")
+WORKER_STAGES = [stage.strip() for stage in os.getenv("WORKER_STAGES", "unzip,transcribe-track,combine,generate-notes").split(",") if stage.strip()]
+WORKER_ID = os.getenv("WORKER_ID") or f"{socket.gethostname()}-{os.getpid()}"
+QUEUE_LEASE_SECONDS = int(os.getenv("QUEUE_LEASE_SECONDS", "300"))
+QUEUE_MAX_ATTEMPTS = int(os.getenv("QUEUE_MAX_ATTEMPTS", "3"))
+QUEUE_POLL_SECONDS = int(os.getenv("QUEUE_POLL_SECONDS", "10"))
+
 # --- Setup Directories ---
 # These are subdirectories for organized output
 CHAT_LOG_OUTPUT_DIR = OUTPUT_DIR / "_chat_log"
@@ -92,6 +116,15 @@ def load_context_files(context_dir: Path) -> str:
                 print(f"Error reading context file {file_path}: {e}")
     return context_data
 
+def load_discord_mapping() -> dict[str, str]:
+    """Loads the mapping of Discord usernames to character names."""
+    try:
+        with open(DISCORD_MAPPING_FILE, "r", encoding='utf-8') as f:
+            return json.load(f)
+    except FileNotFoundError:
+        print(f"Warning: Mapping file '{DISCORD_MAPPING_FILE}' not found. Using raw Discord usernames.")
+        return {}
+
 # --- Main Processing Steps ---
 
 def process_chat_log() -> tuple[int | None, datetime.date | None]:
@@ -136,28 +169,35 @@ def process_chat_log() -> tuple[int | None, datetime.date | None]:
     return session_number, session_date
 
 
-def unzip_audio():
+def unzip_audio(source_dir: Path = AUDIO_SOURCE_DIR, audio_dir: Path = AUDIO_OUTPUT_DIR):
     """Unzips the newest FLAC zip file to the audio output directory."""
-    if any(AUDIO_OUTPUT_DIR.glob("*.flac")):
+    if any(audio_dir.glob("*.flac")):
         print("Audio files already exist. Skipping unzip.")
         return
 
-    newest_zip = get_newest_file(AUDIO_SOURCE_DIR, "craig-*.flac.zip")
+    newest_zip = get_newest_file(source_dir, "craig-*.flac.zip")
     if not newest_zip:
         print("No matching audio zip file (craig-*.flac.zip) found.")
         return
 
+    # Extract next to the audio directory and move it into place only once complete,
+    # so an interrupted extraction is never mistaken for a finished one
+    partial_dir = audio_dir.with_name(f"{audio_dir.name}.partial")
     try:
+        shutil.rmtree(partial_dir, ignore_errors=True)
         with zipfile.ZipFile(newest_zip, 'r') as zip_ref:
-            zip_ref.extractall(AUDIO_OUTPUT_DIR)
-        print(f"Extracted audio to: {AUDIO_OUTPUT_DIR}")
+            zip_ref.extractall(partial_dir)
 
         # Clean up non-FLAC files from the extraction directory
-        for item in AUDIO_OUTPUT_DIR.iterdir():
+        for item in partial_dir.iterdir():
             if item.is_file() and item.suffix != ".flac":
                 os.remove(item)
                 print(f"Deleted non-FLAC file: {item.name}")
 
+        shutil.rmtree(audio_dir, ignore_errors=True)
+        partial_dir.rename(audio_dir)
+        print(f"Extracted audio to: {audio_dir}")
+
         os.remove(newest_zip)
         print(f"Deleted source zip file: {newest_zip.name}")
 
@@ -200,14 +240,54 @@ class _CustomProgressBar(tqdm):
         self._last_update_time = current_time
 
 
+def load_whisper_model():
+    """Loads the Whisper model with the custom progress bar. Returns None on failure."""
+    model_name = "large"
+    device = "cuda" # 'cuda' for NVIDIA/AMD GPUs via ROCm
+
+    # Inject custom progress bar into Whisper
+    transcribe_module = sys.modules['whisper.transcribe']
+    transcribe_module.tqdm.tqdm = _CustomProgressBar
+
+    try:
+        return whisper.load_model(model_name, device=device, download_root="./models/")
+    except Exception as e:
+        print(f"❌ Error loading Whisper model: {e}")
+        print("Ensure you have a compatible ROCm/CUDA version installed.")
+        return None
+
+
+def transcribe_track(model, audio_file: Path, json_output_path: Path) -> bool:
+    """
+    Transcribes a single FLAC track and saves its segments as JSON.
+    Returns True if successful, False if an error occurred.
+    """
+    with open(WHISPER_PROMPT_FILE, "r", encoding='utf-8') as f:
+        initial_prompt = f.read().strip()
+
+    print(f"Transcribing {audio_file.name}...")
+    try:
+        result = model.transcribe(
+            str(audio_file),
+            language="pl",
+            initial_prompt=initial_prompt,
+            fp16=False 
+        )
+        with open(json_output_path, "w", encoding='utf-8') as f:
+            json.dump(result["segments"], f, indent=2, ensure_ascii=False)
+        print(f"\nTranscription of '{audio_file.name}' saved.")
+        return True
+
+    except Exception as e:
+        print(f"\n❌ CRITICAL ERROR transcribing '{audio_file.name}': {e}")
+        return False
+
+
 def transcribe_audio() -> bool:
     """
     Transcribes all FLAC audio files in the audio directory using Whisper.
     Returns True if successful, False if an error occurred.
     """
-    model_name = "large"
-    device = "cuda" # 'cuda' for NVIDIA/AMD GPUs via ROCm
-
     # Check if all audio files are already transcribed
     audio_files = sorted(AUDIO_OUTPUT_DIR.glob("*.flac"), key=os.path.getsize)
     files_to_transcribe = [
@@ -219,62 +299,38 @@ def transcribe_audio() -> bool:
         print("All audio files already transcribed. Skipping.")
         return True
 
-    # Inject custom progress bar into Whisper
-    transcribe_module = sys.modules['whisper.transcribe']
-    transcribe_module.tqdm.tqdm = _CustomProgressBar
-
-    try:
-        model = whisper.load_model(model_name, device=device, download_root="./models/")
-    except Exception as e:
-        print(f"❌ Error loading Whisper model: {e}")
-        print("Ensure you have a compatible ROCm/CUDA version installed.")
+    model = load_whisper_model()
+    if model is None:
         return False
 
-    with open(WHISPER_PROMPT_FILE, "r", encoding='utf-8') as f:
-        initial_prompt = f.read().strip()
-
     for audio_file in tqdm(files_to_transcribe, desc="Transcribing Audio"):
         json_output_path = TEMP_TRANSCRIPTIONS / f"{audio_file.stem}.json"
-        print(f"Transcribing {audio_file.name}...")
-        try:
-            result = model.transcribe(
-                str(audio_file),
-                language="pl",
-                initial_prompt=initial_prompt,
-                fp16=False 
-            )
-            with open(json_output_path, "w", encoding='utf-8') as f:
-                json.dump(result["segments"], f, indent=2, ensure_ascii=False)
-            print(f"\nTranscription of '{audio_file.name}' saved.")
-            
-        except Exception as e:
-            print(f"\n❌ CRITICAL ERROR transcribing '{audio_file.name}': {e}")
+        if not transcribe_track(model, audio_file, json_output_path):
             return False
 
     return True
 
 
-def combine_transcriptions(session_number: int) -> Path | None:
+def combine_transcriptions(
+    session_number: int,
+    transcriptions_dir: Path = TEMP_TRANSCRIPTIONS,
+    output_dir: Path = TRANSCRIPTIONS_OUTPUT_DIR,
+) -> Path | None:
     """
     Combines individual JSON transcriptions into a single JSON and a single TXT file.
     Assigns speaker labels based on the mapping file.
     """
-    combined_json_path = TRANSCRIPTIONS_OUTPUT_DIR / f"session{session_number}.json"
-    combined_txt_path = TRANSCRIPTIONS_OUTPUT_DIR / f"session{session_number}.txt"
+    combined_json_path = output_dir / f"session{session_number}.json"
+    combined_txt_path = output_dir / f"session{session_number}.txt"
 
     if combined_json_path.exists() and combined_txt_path.exists():
         print(f"Combined transcriptions for session {session_number} already exist. Skipping.")
         return combined_txt_path
 
-    try:
-        with open(DISCORD_MAPPING_FILE, "r", encoding='utf-8') as f:
-            discord_character_mapping = json.load(f)
-    except FileNotFoundError:
-        print(f"Warning: Mapping file '{DISCORD_MAPPING_FILE}' not found. Using raw Discord usernames.")
-        discord_character_mapping = {}
+    discord_character_mapping = load_discord_mapping()
 
     all_segments = []
-    json_files = sorted(list(TEMP_TRANSCRIPTIONS.glob("*.json")))
+    json_files = sorted(list(transcriptions_dir.glob("*.json")))
 
     for json_file in json_files:
         try:
@@ -316,6 +372,244 @@ def combine_transcriptions(session_number: int) -> Path | None:
     print(f"Combined transcription saved to {combined_txt_path}")
     return combined_txt_path
 
+# --- Content Caching ---
+
+def estimate_tokens(text: str) -> int:
+    """Roughly estimates the number of tokens in a text (about 4 characters per token)."""
+    return (len(text) + 3) // 4
+
+def _user_message(text: str, key: str) -> dict:
+    """Builds a user message in Gemini ("parts") or instructor ("content") format."""
+    if key == "parts":
+        return {"role": "user", "parts": [text]}
+    return {"role": "user", "content": text}
+
+class InlineContentCache:
+    """
+    Holds the large inputs shared by the requests of a session (campaign context,
+    transcript) and sends them inline with every request that uses them. This is
+    the fallback when the Gemini context cache is disabled or cannot be created,
+    so it never saves any tokens.
+    """
+    def __init__(self, model_name: str):
+        self.model_name = model_name
+        self._contents: dict[str, str] = {}
+        self.references = 0
+        self.referenced_tokens = 0
+
+    def register(self, handle: str, content: str) -> str:
+        """Registers a shared input under a handle. Must be called before upload()."""
+        self._contents[handle] = content
+        return handle
+
+    def upload(self):
+        """Nothing to upload; the registered contents are sent with each request."""
+
+    def close(self):
+        """Nothing to release for the inline cache."""
+
+    @property
+    def uploaded_tokens(self) -> int:
+        """Tokens uploaded to a cache; nothing is uploaded when sending inline."""
+        return 0
+
+    @property
+    def tokens_saved(self) -> int:
+        """Input tokens that did not have to be sent again thanks to the cache."""
+        return 0
+
+    def prepare(self, system_instruction: str, key: str = "parts", handles: list[str] | None = None) -> tuple[genai.GenerativeModel, list[dict]]:
+        """
+        Returns a model and the leading messages of a request that refers to the
+        shared inputs given by `handles` (all of them by default).
+        Use key="content" for messages passed to instructor.
+        """
+        contents = [self._contents[handle] for handle in (handles or self._contents) if handle in self._contents]
+        self.references += 1
+        self.referenced_tokens += sum(estimate_tokens(content) for content in contents)
+        model = genai.GenerativeModel(
+            model_name=self.model_name,
+            system_instruction=system_instruction,
+        )
+        return model, [_user_message(content, key) for content in contents]
+
+    def report(self) -> str:
+        """Describes how the shared inputs were sent and how many tokens caching saved."""
+        return f"Shared inputs sent inline with {self.references} requests (~{self.referenced_tokens} tokens). No tokens saved by caching."
+
+class GeminiContentCache(InlineContentCache):
+    """
+    Uploads the shared inputs once to the Gemini context cache and refers to them
+    by the cache name in later requests. Falls back to inlining if the upload fails
+    (e.g. the inputs are below the model's minimum cacheable size).
+    """
+    def __init__(self, model_name: str, ttl_minutes: int = 60):
+        super().__init__(model_name)
+        self.ttl = datetime.timedelta(minutes=ttl_minutes)
+        self._cached_content = None
+        self._cached_tokens = 0
+
+    def upload(self):
+        """Creates the cached content from all registered inputs."""
+        try:
+            self._cached_content = caching.CachedContent.create(
+                model=self.model_name,
+                display_name="rpgnotes-session",
+                contents=[_user_message(content, "parts") for content in self._contents.values()],
+                ttl=self.ttl,
+            )
+            usage = self._cached_content.usage_metadata
+            self._cached_tokens = (
+                usage.total_token_count if usage
+                else sum(estimate_tokens(content) for content in self._contents.values())
+            )
+            print(f"Shared inputs uploaded to context cache: {self._cached_content.name}")
+        except Exception as e:
+            print(f"Warning: Could not create context cache, sending inputs inline: {e}")
+            self._cached_content = None
+
+    def close(self):
+        """Deletes the cached content instead of waiting for its TTL to expire."""
+        if self._cached_content is None:
+            return
+        try:
+            self._cached_content.delete()
+        except Exception as e:
+            print(f"Warning: Could not delete context cache {self._cached_content.name}: {e}")
+        self._cached_content = None
+
+    @property
+    def uploaded_tokens(self) -> int:
+        return self._cached_tokens
+
+    @property
+    def tokens_saved(self) -> int:
+        if not self._cached_tokens:
+            return super().tokens_saved
+        return max(0, self.referenced_tokens - self._cached_tokens)
+
+    def report(self) -> str:
+        if not self._cached_tokens:
+            return super().report()
+        return (
+            f"Shared inputs: {self._cached_tokens} tokens uploaded once, referenced by {self.references} requests. "
+            f"Tokens saved by caching: {self.tokens_saved}."
+        )
+
+    def prepare(self, system_instruction: str, key: str = "parts", handles: list[str] | None = None) -> tuple[genai.GenerativeModel, list[dict]]:
+        if self._cached_content is None:
+            return super().prepare(system_instruction, key, handles)
+
+        # The cache is a single prefix, so every request using it sees all cached inputs
+        self.references += 1
+        self.referenced_tokens += self.uploaded_tokens
+        # Requests using cached content cannot set a system instruction, so it is sent as a message
+        model = genai.GenerativeModel.from_cached_content(cached_content=self._cached_content)
+        return model, [_user_message(system_instruction, key)]
+
+def create_content_cache() -> InlineContentCache:
+    """Creates the content cache selected in the configuration."""
+    if USE_CONTEXT_CACHE:
+        return GeminiContentCache(GEMINI_MODEL_NAME, ttl_minutes=CONTEXT_CACHE_TTL_MINUTES)
+    return InlineContentCache(GEMINI_MODEL_NAME)
+
+# --- Quote Candidate Selection ---
+
+LAUGHTER_PATTERN = re.compile(r"\b(?:ha){2,}|\b(?:he){2,}|\bxd+\b|śmiech|laugh", re.IGNORECASE)
+TURN_DENSITY_WINDOW = 20.0 # seconds before and after a segment
+
+def score_quote_candidates(segments: list[dict], names: list[str]) -> list[float]:
+    """
+    Scores how likely each transcript segment is to be a memorable quote, based on
+    its length, punctuation, laughter, speaker turn density around it and mentions
+    of named characters. Segments too short or too long to quote score 0.
+    """
+    name_patterns = [re.compile(rf"\b{re.escape(name)}\b", re.IGNORECASE) for name in names]
+    scores = []
+    for i, segment in enumerate(segments):
+        text = segment["text"].strip()
+        word_count = len(text.split())
+        if word_count < 3 or word_count > 45:
+            scores.append(0.0)
+            continue
+
+        score = 1.0 if word_count <= 25 else 0.5
+        score += 0.5 * min(text.count("!"), 3) + 0.25 * min(text.count("?"), 2)
+        if "..." in text:
+            score += 0.25
+        if LAUGHTER_PATTERN.search(text):
+            score += 0.5
+
+        # Laughter from the others right after a line is the best sign of a funny quote
+        for following in segments[i + 1:i + 3]:
+            if following["speaker"] != segment["speaker"] and LAUGHTER_PATTERN.search(following["text"]):
+                score += 1.5
+                break
+
+        # Lively exchanges between several speakers
+        nearby = [
+            s for s in segments[max(0, i - 15):i + 16]
+            if abs(s["start"] - segment["start"]) <= TURN_DENSITY_WINDOW
+        ]
+        turns = sum(1 for a, b in zip(nearby, nearby[1:]) if a["speaker"] != b["speaker"])
+        score += min(turns, 6) / 6
+
+        mentioned = sum(1 for pattern in name_patterns if pattern.search(text))
+        score += 0.75 * min(mentioned, 2)
+        scores.append(score)
+    return scores
+
+def select_quote_candidates(segments: list[dict], names: list[str], count: int = QUOTE_CANDIDATE_COUNT, context: int = QUOTE_CONTEXT_SEGMENTS) -> list[list[dict]]:
+    """
+    Picks up to `count` best-scoring segments and returns them as chronological
+    passages including `context` segments before and after each of them.
+    Overlapping passages are merged.
+    """
+    scores = score_quote_candidates(segments, names)
+    ranked = sorted((i for i, score in enumerate(scores) if score > 0), key=lambda i: scores[i], reverse=True)
+
+    windows = []
+    for i in ranked[:count]:
+        windows.append((max(0, i - context), min(len(segments), i + context + 1)))
+    windows.sort()
+
+    merged = []
+    for start, end in windows:
+        if merged and start <= merged[-1][1]:
+            merged[-1] = (merged[-1][0], max(merged[-1][1], end))
+        else:
+            merged.append((start, end))
+    return [segments[start:end] for start, end in merged]
+
+def format_quote_candidates(passages: list[list[dict]]) -> str:
+    """Formats candidate passages as timestamped speaker lines separated by dividers."""
+    blocks = []
+    for passage in passages:
+        lines = [
+            f"[{time.strftime('%H:%M:%S', time.gmtime(segment['start']))}] {segment['speaker']}: {segment['text'].strip()}"
+            for segment in passage
+        ]
+        blocks.append("\n".join(lines))
+    return "\n---\n".join(blocks)
+
+def load_quote_candidates(transcript_file: Path) -> str | None:
+    """
+    Selects quote candidates from the combined JSON transcript next to the TXT file.
+    Returns None if the JSON transcript is missing or has no candidates.
+    """
+    segments_file = transcript_file.with_suffix(".json")
+    try:
+        with open(segments_file, "r", encoding='utf-8') as f:
+            segments = json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError) as e:
+        print(f"Warning: Could not load segments for quote pre-selection from {segments_file}: {e}")
+        return None
+
+    passages = select_quote_candidates(segments, list(load_discord_mapping().values()))
+    if not passages:
+        return None
+    return format_quote_candidates(passages)
+
 # --- AI Generation and Note Creation ---
 
 class SectionVisuals(BaseModel):
@@ -352,8 +646,13 @@ class QuotesData(BaseModel):
         description="Lista 5-7 najbardziej pamiętnych, zabawnych lub ważnych cytatów z sesji, wraz z informacją, kto je wypowiedział. Np. 'Arevon: \"Coś tu jest nie tak.\"'."
     )
 
-def generate_session_notes(transcript_file: Path) -> tuple[str, SessionData, QuotesData] | None:
-    """Generates a detailed summary, structured data, and quotes using the Gemini API."""
+def generate_session_notes(transcript_file: Path, content_cache: InlineContentCache | None = None) -> tuple[str, SessionData, QuotesData] | None:
+    """
+    Generates a detailed summary, structured data, and quotes using the Gemini API.
+    Quotes are extracted from locally pre-selected transcript passages. If those
+    cannot be selected, the transcript and campaign context are registered in a
+    content cache once and shared by the summary and quotes requests.
+    """
     if not GEMINI_API_KEY:
         print("GEMINI_API_KEY not set in .env file. Skipping note generation.")
         return None
@@ -363,88 +662,105 @@ def generate_session_notes(transcript_file: Path) -> tuple[str, SessionData, Quo
     with open(transcript_file, "r", encoding='utf-8') as f:
         transcript_content = f.read()
 
-    # --- Step 1: Generate Detailed Summary ---
-    with open(SUMMARY_PROMPT_FILE, "r", encoding='utf-8') as f:
-        summary_prompt = f.read()
+    quote_candidates = load_quote_candidates(transcript_file)
+
+    if content_cache is None:
+        # The transcript is only worth uploading to a cache if both requests use it
+        content_cache = create_content_cache() if quote_candidates is None else InlineContentCache(GEMINI_MODEL_NAME)
 
-    summary_model = genai.GenerativeModel(
-        model_name=GEMINI_MODEL_NAME,
-        system_instruction=summary_prompt,
-    )
-    
-    summary_messages = []
-    
     # Load general context from text and markdown files
     general_context = load_context_files(CONTEXT_DIR)
     if general_context:
-        summary_messages.append({"role": "user", "parts": [f"DODATKOWY KONTEKST KAMPANII:\n{general_context}"]})
-
-    summary_messages.append({"role": "user", "parts": [f"TRANSKRYPT OBECNEJ SESJI:\n{transcript_content}"]})
-
-    print("Generating detailed session summary...")
-    summary_response = summary_model.generate_content(
-        summary_messages,
-        generation_config=genai.GenerationConfig(temperature=0.7),
-    )
-    session_summary = summary_response.text
-    print("Session summary generated.")
-
-    # --- Step 2: Extract Structured Details (from summary only) ---
-    print("Waiting for API rate limit...")
-    time.sleep(10)
-
-    with open(DETAILS_PROMPT_FILE, "r", encoding='utf-8') as f:
-        details_prompt = f.read()
-
-    details_client = instructor.from_gemini(
-        client=genai.GenerativeModel(
-            model_name=GEMINI_MODEL_NAME,
-            system_instruction=details_prompt,
-        ),
-        mode=instructor.Mode.GEMINI_JSON,
-    )
-
-    print("Extracting structured details...")
-    details_messages = [{
-        "role": "user",
-        "content": f"PODSUMOWANIE SESJI:\n{session_summary}"
-    }]
-
-    session_data = details_client.chat.completions.create(
-        messages=details_messages,
-        response_model=SessionData,
-        max_retries=3,
-    )
-    print("Session details extracted.")
-
-    # --- Step 3: Extract Quotes (from transcription) ---
-    print("Waiting for API rate limit...")
-    time.sleep(10)
-
-    with open(QUOTES_PROMPT_FILE, "r", encoding='utf-8') as f:
-        quotes_prompt = f.read()
-
-    quotes_client = instructor.from_gemini(
-        client=genai.GenerativeModel(
-            model_name=GEMINI_MODEL_NAME,
-            system_instruction=quotes_prompt,
-        ),
-        mode=instructor.Mode.GEMINI_JSON,
-    )
-
-    print("Extracting memorable quotes...")
-    quotes_messages = [{
-        "role": "user",
-        "content": f"PEŁNA TRANSKRYPCJA:\n{transcript_content}"
-    }]
-
-    quotes_data = quotes_client.chat.completions.create(
-        messages=quotes_messages,
-        response_model=QuotesData,
-        max_retries=3,
-    )
-    print("Quotes extracted.")
+        content_cache.register("context", f"DODATKOWY KONTEKST KAMPANII:\n{general_context}")
+    content_cache.register("transcript", f"TRANSKRYPT OBECNEJ SESJI:\n{transcript_content}")
+    content_cache.upload()
 
+    try:
+        # --- Step 1: Generate Detailed Summary ---
+        with open(SUMMARY_PROMPT_FILE, "r", encoding='utf-8') as f:
+            summary_prompt = f.read()
+
+        summary_model, summary_messages = content_cache.prepare(summary_prompt)
+
+        print("Generating detailed session summary...")
+        summary_response = summary_model.generate_content(
+            summary_messages,
+            generation_config=genai.GenerationConfig(temperature=0.7),
+        )
+        session_summary = summary_response.text
+        print("Session summary generated.")
+
+        # --- Step 2: Extract Structured Details (from summary only) ---
+        print("Waiting for API rate limit...")
+        time.sleep(10)
+
+        with open(DETAILS_PROMPT_FILE, "r", encoding='utf-8') as f:
+            details_prompt = f.read()
+
+        details_client = instructor.from_gemini(
+            client=genai.GenerativeModel(
+                model_name=GEMINI_MODEL_NAME,
+                system_instruction=details_prompt,
+            ),
+            mode=instructor.Mode.GEMINI_JSON,
+        )
+
+        print("Extracting structured details...")
+        details_messages = [{
+            "role": "user",
+            "content": f"PODSUMOWANIE SESJI:\n{session_summary}"
+        }]
+
+        session_data = details_client.chat.completions.create(
+            messages=details_messages,
+            response_model=SessionData,
+            max_retries=3,
+        )
+        print("Session details extracted.")
+
+        # --- Step 3: Extract Quotes (from pre-selected transcript passages) ---
+        print("Waiting for API rate limit...")
+        time.sleep(10)
+
+        with open(QUOTES_PROMPT_FILE, "r", encoding='utf-8') as f:
+            quotes_prompt = f.read()
+
+        if quote_candidates is not None:
+            quotes_model = genai.GenerativeModel(
+                model_name=GEMINI_MODEL_NAME,
+                system_instruction=quotes_prompt,
+            )
+            quotes_messages = [{
+                "role": "user",
+                "content": f"WYBRANE FRAGMENTY TRANSKRYPCJI (wybierz cytaty spośród nich):\n{quote_candidates}"
+            }]
+            candidate_tokens = estimate_tokens(quote_candidates)
+            transcript_tokens = estimate_tokens(transcript_content)
+            print(
+                f"Sending ~{candidate_tokens} tokens of pre-selected passages instead of "
+                f"~{transcript_tokens} tokens of the full transcript (~{max(0, transcript_tokens - candidate_tokens)} tokens saved)."
+            )
+        else:
+            quotes_model, quotes_messages = content_cache.prepare(quotes_prompt, key="content", handles=["transcript"])
+
+        quotes_client = instructor.from_gemini(
+            client=quotes_model,
+            mode=instructor.Mode.GEMINI_JSON,
+        )
+
+        print("Extracting memorable quotes...")
+        quotes_data = quotes_client.chat.completions.create(
+            messages=quotes_messages,
+            response_model=QuotesData,
+            max_retries=3,
+        )
+        print("Quotes extracted.")
+    finally:
+        content_cache.close()
+
+    # With pre-selected quote candidates the transcript is sent only once, so there is no caching to report
+    if quote_candidates is None:
+        print(content_cache.report())
     return session_summary, session_data, quotes_data
 
 def save_summary_file(session_summary: str, session_data: SessionData, quotes_data: QuotesData, session_number: int, session_date: datetime.date):
@@ -500,6 +816,227 @@ def save_summary_file(session_summary: str, session_data: SessionData, quotes_da
         f.write(output)
     print(f"Session notes saved to {output_file}")
 
+# --- Search Index ---
+
+class SearchIndex:
+    """
+    Incremental SQLite FTS5 index over all session transcripts (one row per
+    segment) and notes (one row per line). Only files that changed since the
+    last update are re-indexed. Only the text is searchable; speakers are
+    matched with the speaker filter.
+    """
+    SCHEMA_VERSION = 1
+
+    def __init__(self, db_path: Path):
+        db_path.parent.mkdir(parents=True, exist_ok=True)
+        self.conn = sqlite3.connect(db_path)
+        self.conn.row_factory = sqlite3.Row
+        if self.conn.execute("PRAGMA user_version").fetchone()[0] < self.SCHEMA_VERSION:
+            # Rebuild indexes created with an older schema from scratch
+            self.conn.executescript("""
+                DROP TRIGGER IF EXISTS segments_ai;
+                DROP TRIGGER IF EXISTS segments_ad;
+                DROP TABLE IF EXISTS segments_fts;
+                DROP TABLE IF EXISTS segments;
+                DROP TABLE IF EXISTS indexed_files;
+            """)
+            self.conn.execute(f"PRAGMA user_version = {self.SCHEMA_VERSION}")
+        self.conn.executescript("""
+            CREATE TABLE IF NOT EXISTS indexed_files (
+                path TEXT PRIMARY KEY,
+                mtime REAL NOT NULL,
+                size INTEGER NOT NULL
+            );
+            CREATE TABLE IF NOT EXISTS segments (
+                id INTEGER PRIMARY KEY,
+                path TEXT NOT NULL,
+                session_number INTEGER NOT NULL,
+                source TEXT NOT NULL,
+                speaker TEXT,
+                start_ms INTEGER,
+                text TEXT NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS segments_path ON segments (path);
+            CREATE VIRTUAL TABLE IF NOT EXISTS segments_fts USING fts5(
+                text, speaker UNINDEXED, content='segments', content_rowid='id',
+                tokenize='unicode61 remove_diacritics 2'
+            );
+            CREATE TRIGGER IF NOT EXISTS segments_ai AFTER INSERT ON segments BEGIN
+                INSERT INTO segments_fts (rowid, text, speaker) VALUES (new.id, new.text, new.speaker);
+            END;
+            CREATE TRIGGER IF NOT EXISTS segments_ad AFTER DELETE ON segments BEGIN
+                INSERT INTO segments_fts (segments_fts, rowid, text, speaker) VALUES ('delete', old.id, old.text, old.speaker);
+            END;
+        """)
+
+    def close(self):
+        self.conn.close()
+
+    def update(self, transcripts_dir: Path = TRANSCRIPTIONS_OUTPUT_DIR, notes_dir: Path = OUTPUT_DIR) -> tuple[int, int]:
+        """
+        Indexes new and changed transcripts and notes, and drops deleted ones.
+        Returns the number of files (re)indexed and removed.
+        """
+        files = {}
+        for path in transcripts_dir.glob("session*.json"):
+            files[path] = "transcript"
+        for path in notes_dir.glob("Sesja * - *.md"):
+            files[path] = "notes"
+
+        indexed_files = {
+            row["path"]: (row["mtime"], row["size"])
+            for row in self.conn.execute("SELECT path, mtime, size FROM indexed_files")
+        }
+        current_paths = {str(path) for path in files}
+
+        removed = 0
+        with self.conn:
+            for path in indexed_files.keys() - current_paths:
+                self.conn.execute("DELETE FROM segments WHERE path = ?", (path,))
+                self.conn.execute("DELETE FROM indexed_files WHERE path = ?", (path,))
+                removed += 1
+
+        indexed = 0
+        for path, source in sorted(files.items()):
+            stat = path.stat()
+            if indexed_files.get(str(path)) == (stat.st_mtime, stat.st_size):
+                continue
+            try:
+                rows = self._read_transcript(path) if source == "transcript" else self._read_notes(path)
+            except (OSError, json.JSONDecodeError, KeyError, TypeError, ValueError, UnicodeDecodeError) as e:
+                print(f"Warning: Could not index {path}: {e}")
+                continue
+            if rows is None:
+                print(f"Warning: Skipping {path.name}, no session number in its name.")
+                continue
+
+            # Replace the rows of a file in one transaction so searches never see it half-indexed
+            with self.conn:
+                self.conn.execute("DELETE FROM segments WHERE path = ?", (str(path),))
+                self.conn.executemany(
+                    "INSERT INTO segments (path, session_number, source, speaker, start_ms, text) VALUES (?, ?, ?, ?, ?, ?)",
+                    [(str(path), session_number, source, speaker, start_ms, text) for session_number, speaker, start_ms, text in rows],
+                )
+                self.conn.execute(
+                    "INSERT OR REPLACE INTO indexed_files (path, mtime, size) VALUES (?, ?, ?)",
+                    (str(path), stat.st_mtime, stat.st_size),
+                )
+            indexed += 1
+        return indexed, removed
+
+    def _read_transcript(self, path: Path) -> list[tuple[int, str | None, int | None, str]] | None:
+        match = re.fullmatch(r'session(\d+)\.json', path.name)
+        if not match:
+            return None
+        session_number = int(match.group(1))
+        with open(path, "r", encoding='utf-8') as f:
+            segments = json.load(f)
+        return [
+            (session_number, segment.get("speaker"), round(segment["start"] * 1000), segment["text"].strip())
+            for segment in segments
+            if segment["text"].strip()
+        ]
+
+    def _read_notes(self, path: Path) -> list[tuple[int, str | None, int | None, str]] | None:
+        match = re.match(r'Sesja (\d+) - ', path.name)
+        if not match:
+            return None
+        session_number = int(match.group(1))
+        with open(path, "r", encoding='utf-8') as f:
+            lines = [line.strip() for line in f]
+        return [(session_number, None, None, line) for line in lines if line]
+
+    def search(self, query: str, session_number: int | None = None, speaker: str | None = None, limit: int = 20, latest_first: bool = False) -> list[sqlite3.Row]:
+        """
+        Returns matching rows with the matched words highlighted. Every word of the
+        query must match; a word ending with * matches as a prefix.
+        """
+        terms = []
+        for word in query.split():
+            prefix = word.endswith("*")
+            word = word.rstrip("*")
+            if word:
+                terms.append('"' + word.replace('"', '""') + '"' + ("*" if prefix else ""))
+        if not terms:
+            return []
+
+        sql = """SELECT s.session_number, s.source, s.speaker, s.start_ms, highlight(segments_fts, 0, '[', ']') AS text
+                 FROM segments_fts JOIN segments s ON s.id = segments_fts.rowid
+                 WHERE segments_fts MATCH ?"""
+        params = [" ".join(terms)]
+        if session_number is not None:
+            sql += " AND s.session_number = ?"
+            params.append(session_number)
+        if speaker:
+            sql += " AND s.speaker = ? COLLATE NOCASE"
+            params.append(speaker)
+        sql += " ORDER BY s.session_number DESC, s.source DESC, s.start_ms" if latest_first else " ORDER BY rank"
+        sql += " LIMIT ?"
+        params.append(limit)
+        return self.conn.execute(sql, params).fetchall()
+
+def format_search_hit(row: sqlite3.Row) -> str:
+    """Formats a search hit as a single line with the session and timestamp in milliseconds."""
+    if row["start_ms"] is None:
+        location = "notes"
+    else:
+        ms = row["start_ms"]
+        location = f"{ms // 3600000:02}:{ms // 60000 % 60:02}:{ms // 1000 % 60:02}.{ms % 1000:03} | {ms} ms"
+    speaker = f"{row['speaker']}: " if row["speaker"] else ""
+    return f"Sesja {row['session_number']} [{location}] {speaker}{row['text']}"
+
+def update_search_index():
+    """
+    Brings the search index up to date with the transcripts and notes in the output
+    directory. Best-effort: errors are only reported, so they never fail a workflow.
+    """
+    try:
+        index = SearchIndex(SEARCH_INDEX_FILE)
+        try:
+            indexed, removed = index.update()
+        finally:
+            index.close()
+        print(f"🔎 Search index updated: {indexed} file(s) indexed, {removed} removed.")
+    except Exception as e:
+        print(f"⚠️ Could not update search index: {e}")
+
+def search_sessions(query: str, session_number: int | None = None, speaker: str | None = None, limit: int = 20, latest_first: bool = False):
+    """Searches all indexed transcripts and notes and prints the hits."""
+    if not SEARCH_INDEX_FILE.exists():
+        print(f"Search index not built yet ({SEARCH_INDEX_FILE}). Run a workflow or search with --update.")
+        return
+
+    try:
+        index = SearchIndex(SEARCH_INDEX_FILE)
+        try:
+            start_time = time.time()
+            hits = index.search(query, session_number, speaker, limit, latest_first)
+            elapsed_ms = (time.time() - start_time) * 1000
+        finally:
+            index.close()
+    except sqlite3.Error as e:
+        print(f"❌ Could not search the index: {e}")
+        return
+
+    for hit in hits:
+        print(format_search_hit(hit))
+    print(f"{len(hits)} hit(s) in {elapsed_ms:.1f} ms.")
+
+def search_cli(args: list[str]):
+    """Command-line entry point: python main.py search <query> [--session N] [--speaker NAME] [--limit N] [--latest]."""
+    parser = argparse.ArgumentParser(prog="main.py search", description="Search all session transcripts and notes.")
+    parser.add_argument("query", nargs="+", help="Words to search for; end a word with * to match it as a prefix.")
+    parser.add_argument("--session", type=int, help="Only search this session number.")
+    parser.add_argument("--speaker", help="Only search lines spoken by this speaker.")
+    parser.add_argument("--limit", type=int, default=20, help="Maximum number of hits (default: 20).")
+    parser.add_argument("--latest", action="store_true", help="Show the newest sessions first instead of the best matches.")
+    parser.add_argument("--update", action="store_true", help="Update the index before searching.")
+    parsed = parser.parse_args(args)
+
+    if parsed.update or not SEARCH_INDEX_FILE.exists():
+        update_search_index()
+    search_sessions(" ".join(parsed.query), parsed.session, parsed.speaker, parsed.limit, parsed.latest)
+
 # --- Workflow Functions ---
 
 def run_transcription_workflow():
@@ -536,6 +1073,8 @@ def run_transcription_workflow():
          return None
     print("✅ Transcriptions combined.")
     
+    update_search_index()
+
     end_time = time.time()
     print(f"\n✨ Transcription workflow completed in {time.strftime('%H:%M:%S', time.gmtime(end_time - start_time))}. ✨")
     return transcript_file, session_number, session_date
@@ -561,6 +1100,8 @@ def run_full_workflow():
     else:
         print("⚠️ AI note generation was skipped or failed.")
 
+    update_search_index()
+
     end_time = time.time()
     print(f"\n✨ Full workflow completed in {time.strftime('%H:%M:%S', time.gmtime(end_time - start_time))}. ✨")
 
@@ -652,8 +1193,437 @@ def run_manual_workflow():
 
     # 5. Save the final file using the existing function
     save_summary_file(session_summary, session_data, quotes_data, session_number, session_date)
+    update_search_index()
     print("\n✨ Manual entry workflow completed successfully. ✨")
 
+# --- Distributed Work Queue ---
+
+class Job(BaseModel):
+    """A single stage of a session's workflow, claimed by one worker at a time."""
+    id: int
+    session_number: int
+    stage: str
+    payload: dict
+    attempts: int
+    max_attempts: int
+
+class JobStore:
+    """
+    SQLite-backed job store shared by all worker nodes. Workers claim jobs under
+    a time-limited lease and keep it alive with heartbeats; jobs whose lease
+    expires are handed to another worker until max_attempts is reached.
+    """
+    def __init__(self, db_path: Path):
+        self.db_path = db_path
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        with self._transaction() as conn:
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS jobs (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    session_number INTEGER NOT NULL,
+                    stage TEXT NOT NULL,
+                    payload TEXT NOT NULL,
+                    status TEXT NOT NULL DEFAULT 'pending',
+                    attempts INTEGER NOT NULL DEFAULT 0,
+                    max_attempts INTEGER NOT NULL,
+                    worker TEXT,
+                    lease_expires REAL,
+                    error TEXT,
+                    created_at REAL NOT NULL,
+                    updated_at REAL NOT NULL
+                )""")
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS job_dependencies (
+                    job_id INTEGER NOT NULL,
+                    depends_on INTEGER NOT NULL,
+                    PRIMARY KEY (job_id, depends_on)
+                )""")
+            conn.execute("CREATE INDEX IF NOT EXISTS jobs_status ON jobs (status, stage)")
+
+    def _transaction(self):
+        """Opens a connection whose `with` block is a single write-locked transaction."""
+        conn = sqlite3.connect(self.db_path, timeout=30, isolation_level=None)
+        conn.row_factory = sqlite3.Row
+        return _SQLiteTransaction(conn)
+
+    def _insert(self, conn, session_number: int, stage: str, payload: dict, depends_on: list[int] = ()) -> int:
+        now = time.time()
+        cursor = conn.execute(
+            "INSERT INTO jobs (session_number, stage, payload, max_attempts, created_at, updated_at) VALUES (?, ?, ?, ?, ?, ?)",
+            (session_number, stage, json.dumps(payload, ensure_ascii=False), QUEUE_MAX_ATTEMPTS, now, now),
+        )
+        job_id = cursor.lastrowid
+        conn.executemany(
+            "INSERT INTO job_dependencies (job_id, depends_on) VALUES (?, ?)",
+            [(job_id, dependency) for dependency in depends_on],
+        )
+        return job_id
+
+    def is_session_active(self, session_number: int) -> bool:
+        """Returns True if the session has jobs that are still pending or running."""
+        with self._transaction() as conn:
+            return conn.execute(
+                "SELECT 1 FROM jobs WHERE session_number = ? AND status IN ('pending', 'running')",
+                (session_number,),
+            ).fetchone() is not None
+
+    def enqueue_session(self, session_number: int, payload: dict) -> int | None:
+        """
+        Queues the first stage of a session's workflow, replacing the jobs of an
+        earlier run that has finished or failed. Returns None if it is still queued.
+        """
+        with self._transaction() as conn:
+            if conn.execute(
+                "SELECT 1 FROM jobs WHERE session_number = ? AND status IN ('pending', 'running')",
+                (session_number,),
+            ).fetchone():
+                return None
+            conn.execute(
+                "DELETE FROM job_dependencies WHERE job_id IN (SELECT id FROM jobs WHERE session_number = ?)",
+                (session_number,),
+            )
+            conn.execute("DELETE FROM jobs WHERE session_number = ?", (session_number,))
+            return self._insert(conn, session_number, "unzip", payload)
+
+    def claim(self, worker_id: str, stages: list[str], lease_seconds: int) -> Job | None:
+        """Claims the oldest runnable job for one of the given stages, or returns None."""
+        now = time.time()
+        with self._transaction() as conn:
+            # Return jobs with expired leases to the queue, or fail them if out of attempts
+            conn.execute(
+                """UPDATE jobs SET status = CASE WHEN attempts >= max_attempts THEN 'failed' ELSE 'pending' END,
+                       worker = NULL, error = 'Lease expired (worker ' || worker || ' stopped sending heartbeats)', updated_at = ?
+                   WHERE status = 'running' AND lease_expires < ?""",
+                (now, now),
+            )
+            # Jobs waiting on a failed job can never run
+            conn.execute(
+                """UPDATE jobs SET status = 'failed', error = 'A job it depends on failed', updated_at = ?
+                   WHERE status = 'pending' AND EXISTS (
+                       SELECT 1 FROM job_dependencies d JOIN jobs dep ON dep.id = d.depends_on
+                       WHERE d.job_id = jobs.id AND dep.status = 'failed')""",
+                (now,),
+            )
+            placeholders = ", ".join("?" for _ in stages)
+            row = conn.execute(
+                f"""SELECT * FROM jobs
+                    WHERE status = 'pending' AND stage IN ({placeholders}) AND NOT EXISTS (
+                        SELECT 1 FROM job_dependencies d JOIN jobs dep ON dep.id = d.depends_on
+                        WHERE d.job_id = jobs.id AND dep.status != 'done')
+                    ORDER BY session_number, id LIMIT 1""",
+                stages,
+            ).fetchone()
+            if row is None:
+                return None
+            conn.execute(
+                """UPDATE jobs SET status = 'running', worker = ?, attempts = attempts + 1,
+                       lease_expires = ?, error = NULL, updated_at = ?
+                   WHERE id = ?""",
+                (worker_id, now + lease_seconds, now, row["id"]),
+            )
+            return Job(
+                id=row["id"],
+                session_number=row["session_number"],
+                stage=row["stage"],
+                payload=json.loads(row["payload"]),
+                attempts=row["attempts"] + 1,
+                max_attempts=row["max_attempts"],
+            )
+
+    def heartbeat(self, job: Job, worker_id: str, lease_seconds: int) -> bool:
+        """Extends the lease on a job. Returns False if the worker no longer holds it."""
+        now = time.time()
+        with self._transaction() as conn:
+            cursor = conn.execute(
+                "UPDATE jobs SET lease_expires = ?, updated_at = ? WHERE id = ? AND worker = ? AND status = 'running'",
+                (now + lease_seconds, now, job.id, worker_id),
+            )
+            return cursor.rowcount == 1
+
+    def complete(self, job: Job, worker_id: str, next_jobs: list[tuple[str, dict]] = (), final_job: tuple[str, dict] | None = None) -> bool:
+        """
+        Marks a job as done and queues its follow-up jobs in the same transaction.
+        next_jobs can run in parallel; final_job runs after all of them are done.
+        Returns False (and queues nothing) if the worker no longer holds the job.
+        """
+        now = time.time()
+        with self._transaction() as conn:
+            cursor = conn.execute(
+                "UPDATE jobs SET status = 'done', lease_expires = NULL, updated_at = ? WHERE id = ? AND worker = ? AND status = 'running'",
+                (now, job.id, worker_id),
+            )
+            if cursor.rowcount != 1:
+                return False
+            next_ids = [self._insert(conn, job.session_number, stage, payload) for stage, payload in next_jobs]
+            if final_job:
+                stage, payload = final_job
+                self._insert(conn, job.session_number, stage, payload, depends_on=next_ids)
+            return True
+
+    def fail(self, job: Job, worker_id: str, error: str):
+        """Returns a job to the queue for a retry, or marks it as failed if out of attempts."""
+        with self._transaction() as conn:
+            conn.execute(
+                """UPDATE jobs SET status = CASE WHEN attempts >= max_attempts THEN 'failed' ELSE 'pending' END,
+                       worker = NULL, lease_expires = NULL, error = ?, updated_at = ?
+                   WHERE id = ? AND worker = ? AND status = 'running'""",
+                (error, time.time(), job.id, worker_id),
+            )
+
+    def status(self) -> list[sqlite3.Row]:
+        """Returns the number of jobs per session, stage and status."""
+        with self._transaction() as conn:
+            return conn.execute(
+                """SELECT session_number, stage, status, COUNT(*) AS count, MAX(error) AS error FROM jobs
+                   GROUP BY session_number, stage, status ORDER BY session_number, MIN(id)"""
+            ).fetchall()
+
+class _SQLiteTransaction:
+    """Context manager running a block in a BEGIN IMMEDIATE transaction and closing the connection."""
+    def __init__(self, conn: sqlite3.Connection):
+        self.conn = conn
+
+    def __enter__(self) -> sqlite3.Connection:
+        self.conn.execute("BEGIN IMMEDIATE")
+        return self.conn
+
+    def __exit__(self, exc_type, exc, tb):
+        try:
+            self.conn.execute("ROLLBACK" if exc_type else "COMMIT")
+        finally:
+            self.conn.close()
+
+def get_job_store() -> JobStore:
+    """Opens the job store in the shared queue directory."""
+    return JobStore(QUEUE_DIR / "jobs.sqlite3")
+
+def get_session_work_dir(session_number: int) -> Path:
+    """Returns the shared directory holding the artifacts of a queued session."""
+    return QUEUE_DIR / f"session{session_number}"
+
+def enqueue_session_workflow():
+    """Prepares the newest session and queues it for the worker nodes."""
+    print("\n[Step 1/2] Processing Chat Log...")
+    session_number, session_date = process_chat_log()
+    if session_number is None:
+        print("❌ Error processing chat log. Aborting.")
+        return
+
+    if session_date is None:
+        today = datetime.date.today()
+        session_date = today - datetime.timedelta(days=today.weekday())
+        print(f"⚠️ Could not determine date. Defaulting to last Monday: {session_date.strftime('%Y-%m-%d')}")
+
+    print(f"✅ Found Session Number: {session_number}")
+    print(f"✅ Found Session Date: {session_date.strftime('%Y-%m-%d')}")
+
+    print("\n[Step 2/2] Queueing Session for Worker Nodes...")
+    try:
+        store = get_job_store()
+        if store.is_session_active(session_number):
+            print(f"⚠️ Session {session_number} is already queued.")
+            return
+    except sqlite3.Error as e:
+        print(f"❌ Could not open the work queue in {QUEUE_DIR}: {e}")
+        return
+
+    work_dir = get_session_work_dir(session_number)
+    work_dir.mkdir(parents=True, exist_ok=True)
+
+    # Move the audio zip to the shared directory so any node can unzip it.
+    # A session queued again after a failure without a new zip reuses the artifacts already there.
+    newest_zip = get_newest_file(AUDIO_SOURCE_DIR, "craig-*.flac.zip")
+    if newest_zip:
+        # Artifacts of an earlier recording would be skipped over instead of being redone
+        for stale_dir in [work_dir / "audio", work_dir / "audio.partial", work_dir / "transcriptions"]:
+            shutil.rmtree(stale_dir, ignore_errors=True)
+        for stale_file in [*work_dir.glob("craig-*.flac.zip"), *work_dir.glob(f"session{session_number}.*")]:
+            stale_file.unlink()
+        shutil.move(newest_zip, work_dir / newest_zip.name)
+        print(f"Moved {newest_zip.name} to {work_dir}")
+    elif not any(work_dir.glob("craig-*.flac.zip")) and not any((work_dir / "audio").glob("*.flac")):
+        print("❌ No matching audio zip file (craig-*.flac.zip) found. Aborting.")
+        return
+
+    try:
+        job_id = store.enqueue_session(session_number, {"session_date": session_date.isoformat()})
+    except sqlite3.Error as e:
+        print(f"❌ Could not queue session {session_number}: {e}")
+        print(f"The audio is kept in {work_dir}; choose this option again to retry.")
+        return
+    if job_id is None:
+        print(f"⚠️ Session {session_number} is already queued.")
+    else:
+        print(f"✅ Session {session_number} queued (job {job_id}).")
+
+_worker_whisper_model = None
+
+def _run_unzip_job(job: Job) -> tuple[list[tuple[str, dict]], tuple[str, dict] | None]:
+    work_dir = get_session_work_dir(job.session_number)
+    audio_dir = work_dir / "audio"
+    audio_dir.mkdir(parents=True, exist_ok=True)
+    unzip_audio(source_dir=work_dir, audio_dir=audio_dir)
+
+    # Largest tracks first, so they start on the available nodes as early as possible
+    tracks = sorted(audio_dir.glob("*.flac"), key=os.path.getsize, reverse=True)
+    if not tracks:
+        raise RuntimeError(f"No FLAC tracks found in {audio_dir}")
+    next_jobs = [("transcribe-track", {**job.payload, "track": track.name}) for track in tracks]
+    return next_jobs, ("combine", job.payload)
+
+def _run_transcribe_track_job(job: Job) -> tuple[list[tuple[str, dict]], tuple[str, dict] | None]:
+    global _worker_whisper_model
+    work_dir = get_session_work_dir(job.session_number)
+    audio_file = work_dir / "audio" / job.payload["track"]
+    transcriptions_dir = work_dir / "transcriptions"
+    transcriptions_dir.mkdir(parents=True, exist_ok=True)
+    json_output_path = transcriptions_dir / f"{audio_file.stem}.json"
+
+    if not json_output_path.exists():
+        if _worker_whisper_model is None:
+            _worker_whisper_model = load_whisper_model()
+            if _worker_whisper_model is None:
+                raise RuntimeError("Could not load the Whisper model")
+        # Write to a temporary file first so a half-written transcript is never picked up
+        partial_path = json_output_path.with_name(f"{json_output_path.stem}.{WORKER_ID}.partial")
+        if not transcribe_track(_worker_whisper_model, audio_file, partial_path):
+            raise RuntimeError(f"Transcription of {audio_file.name} failed")
+        partial_path.replace(json_output_path)
+    return [], None
+
+def _run_combine_job(job: Job) -> tuple[list[tuple[str, dict]], tuple[str, dict] | None]:
+    work_dir = get_session_work_dir(job.session_number)
+    transcript_file = combine_transcriptions(job.session_number, work_dir / "transcriptions", work_dir)
+    if not transcript_file:
+        raise RuntimeError("Combining transcriptions failed")
+    return [("generate-notes", job.payload)], None
+
+def _run_generate_notes_job(job: Job) -> tuple[list[tuple[str, dict]], tuple[str, dict] | None]:
+    work_dir = get_session_work_dir(job.session_number)
+    # Keep a copy of the combined transcript next to the notes, like the local workflow does
+    for suffix in [".json", ".txt"]:
+        shutil.copy2(work_dir / f"session{job.session_number}{suffix}", TRANSCRIPTIONS_OUTPUT_DIR)
+    transcript_file = TRANSCRIPTIONS_OUTPUT_DIR / f"session{job.session_number}.txt"
+
+    notes = generate_session_notes(transcript_file)
+    if not notes:
+        raise RuntimeError("AI note generation was skipped or failed")
+    summary, details, quotes = notes
+    session_date = datetime.date.fromisoformat(job.payload["session_date"])
+    save_summary_file(summary, details, quotes, job.session_number, session_date)
+    update_search_index()
+    return [], None
+
+JOB_HANDLERS = {
+    "unzip": _run_unzip_job,
+    "transcribe-track": _run_transcribe_track_job,
+    "combine": _run_combine_job,
+    "generate-notes": _run_generate_notes_job,
+}
+
+def run_job(store: JobStore, job: Job, worker_id: str = WORKER_ID):
+    """Runs a claimed job while sending heartbeats, then reports the result to the store."""
+    print(f"\n▶️ Job {job.id}: {job.stage} for session {job.session_number} (attempt {job.attempts}/{job.max_attempts})")
+    stop_heartbeat = threading.Event()
+
+    def send_heartbeats():
+        while not stop_heartbeat.wait(QUEUE_LEASE_SECONDS / 3):
+            try:
+                if not store.heartbeat(job, worker_id, QUEUE_LEASE_SECONDS):
+                    print(f"\n⚠️ Lost the lease on job {job.id}. Its result will be discarded.")
+                    return
+            except sqlite3.Error as e:
+                # Keep trying; the lease only expires if this lasts for the whole lease time
+                print(f"\n⚠️ Could not send heartbeat for job {job.id}: {e}")
+
+    heartbeat_thread = threading.Thread(target=send_heartbeats, daemon=True)
+    heartbeat_thread.start()
+    try:
+        next_jobs, final_job = JOB_HANDLERS[job.stage](job)
+    except Exception as e:
+        print(f"\n❌ Job {job.id} failed: {e}")
+        _retry_store_call(store.fail, job, worker_id, str(e))
+        return
+    finally:
+        stop_heartbeat.set()
+        heartbeat_thread.join()
+
+    completed = _retry_store_call(store.complete, job, worker_id, next_jobs, final_job)
+    if completed:
+        print(f"✅ Job {job.id} done.")
+    elif completed is False:
+        print(f"⚠️ Job {job.id} was taken over by another worker. Result discarded.")
+
+def _retry_store_call(method, *args):
+    """
+    Calls a job store method, retrying while the database is locked or unreachable
+    for up to one lease period. Returns None if it never succeeded; the job is then
+    retried by another worker once its lease expires.
+    """
+    deadline = time.time() + QUEUE_LEASE_SECONDS
+    delay = 1
+    while True:
+        try:
+            return method(*args)
+        except sqlite3.Error as e:
+            if time.time() + delay > deadline:
+                print(f"❌ Giving up on the job store: {e}")
+                return None
+            print(f"⚠️ Job store error, retrying in {delay} s: {e}")
+            time.sleep(delay)
+            delay = min(delay * 2, 30)
+
+def run_worker(stages: list[str] = WORKER_STAGES, worker_id: str = WORKER_ID):
+    """Claims and runs jobs for the given stages until interrupted with Ctrl+C."""
+    unknown_stages = [stage for stage in stages if stage not in JOB_HANDLERS]
+    if unknown_stages:
+        print(f"❌ Unknown worker stages: {', '.join(unknown_stages)}. Available: {', '.join(JOB_HANDLERS)}")
+        return
+
+    store = get_job_store()
+    print(f"👷 Worker '{worker_id}' running stages: {', '.join(stages)}. Press Ctrl+C to stop.")
+    try:
+        while True:
+            try:
+                job = store.claim(worker_id, stages, QUEUE_LEASE_SECONDS)
+            except sqlite3.Error as e:
+                print(f"⚠️ Could not claim a job: {e}. Retrying in {QUEUE_POLL_SECONDS} s.")
+                time.sleep(QUEUE_POLL_SECONDS)
+                continue
+            if job is None:
+                time.sleep(QUEUE_POLL_SECONDS)
+                continue
+            run_job(store, job, worker_id)
+    except KeyboardInterrupt:
+        print("\n👋 Worker stopped. Unfinished jobs will be retried once their lease expires.")
+
+def print_queue_status():
+    """Prints the number of jobs per session, stage and status."""
+    try:
+        rows = get_job_store().status()
+    except sqlite3.Error as e:
+        print(f"❌ Could not read the work queue in {QUEUE_DIR}: {e}")
+        return
+    if not rows:
+        print("The work queue is empty.")
+        return
+    for row in rows:
+        line = f"Session {row['session_number']:>4} | {row['stage']:<16} | {row['status']:<8} | {row['count']}"
+        if row["status"] == "failed" and row["error"]:
+            line += f" | {row['error']}"
+        print(line)
+
+def worker_cli(args: list[str]):
+    """Command-line entry point: python main.py worker [--stages STAGE,...] [--id WORKER_ID]."""
+    parser = argparse.ArgumentParser(prog="main.py worker", description="Run as a worker node of the distributed work queue.")
+    parser.add_argument("--stages", default=",".join(WORKER_STAGES), help=f"Comma-separated stages to run (default: {','.join(WORKER_STAGES)}).")
+    parser.add_argument("--id", default=WORKER_ID, help=f"Name of this worker in the job store (default: {WORKER_ID}).")
+    parsed = parser.parse_args(args)
+
+    # Workers keep their artifacts in QUEUE_DIR, so the temporary directory is left alone
+    setup_directories()
+    run_worker([stage.strip() for stage in parsed.stages.split(",") if stage.strip()], parsed.id)
+
 # --- Main Orchestration ---
 
 def handle_temp_directory():
@@ -690,15 +1660,19 @@ def display_menu():
     print("  [1] Start Full Workflow (Transcribe -> Generate AI Notes)")
     print("  [2] Run Workflow until Transcribing (Generate transcript file only)")
     print("  [3] Manual Note Entry (from existing summary/details)")
-    print("  [4] Exit")
+    print("  [4] Queue Full Workflow for Worker Nodes")
+    print("  [5] Run as Worker Node")
+    print("  [6] Show Work Queue Status")
+    print("  [7] Search Transcripts and Notes")
+    print("  [8] Exit")
     print("="*50)
     
     while True:
-        choice = input("Enter your choice [1-4]: ").strip()
-        if choice in ['1', '2', '3', '4']:
+        choice = input("Enter your choice [1-8]: ").strip()
+        if choice in ['1', '2', '3', '4', '5', '6', '7', '8']:
             return choice
         else:
-            print("❌ Invalid choice. Please enter a number from 1 to 4.")
+            print("❌ Invalid choice. Please enter a number from 1 to 8.")
 
 def main():
     """Main function to orchestrate the entire workflow via a menu."""
@@ -723,8 +1697,32 @@ def main():
             run_manual_workflow()
 
         elif choice == '4':
+            print("\nQueueing Session for Worker Nodes...")
+            enqueue_session_workflow()
+
+        elif choice == '5':
+            print("\nStarting Worker Node...")
+            run_worker()
+
+        elif choice == '6':
+            print("\nWork Queue Status:")
+            print_queue_status()
+
+        elif choice == '7':
+            update_search_index()
+            query = input("Search for: ").strip()
+            if query:
+                search_sessions(query)
+
+        elif choice == '8':
             print("\n👋 Exiting. Goodbye!")
             break
 
 if __name__ == "__main__":
-    main()
+    # "python main.py search <query>" and "python main.py worker" run without going through the menu
+    if len(sys.argv) > 1 and sys.argv[1] == "search":
+        search_cli(sys.argv[2:])
+    elif len(sys.argv) > 1 and sys.argv[1] == "worker":
+        worker_cli(sys.argv[2:])
+    else:
+        main()